@@ -3,7 +3,7 @@ import numpy as np
 from logger_config import analysis_logger
 from utils import calculate_portfolio_value
 
-def calculate_strategy_statistics(df, signals, strategy_name):
+def calculate_strategy_statistics(df, signals, strategy_name, values=None):
     """
     计算策略统计指标（仅计算，不输出）
     
@@ -11,11 +11,13 @@ def calculate_strategy_statistics(df, signals, strategy_name):
         df: 数据框
         signals: 交易信号列表
         strategy_name: 策略名称
+        values: 已计算的净值数组（可选，调用方已有时传入以避免重复计算）
     
     返回:
         统计指标字典
     """
-    values = calculate_portfolio_value(df, signals)
+    if values is None:
+        values = calculate_portfolio_value(df, signals)
     returns = pd.Series(values).pct_change().dropna()
     
     # 持仓统计
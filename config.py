@@ -42,8 +42,11 @@ CONFIG = {
     
     # 文件和目录
     'DATA_FILE': 'hs300_data.csv',
+    'DATE_FORMAT': '%Y-%m-%d',
     'PICTURE_DIR': 'picture',
+    'PLOT_DPI': 120,  # 策略对比图的保存分辨率，其余图表使用 matplotlib 默认值 100
     'LOG_DIR': 'logs',
+    'CACHE_DIR': 'cache',
     
     # 成本率
     'COST_RATES': [0.0, 0.002, 0.003],
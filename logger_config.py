@@ -35,7 +35,8 @@ def setup_logger(module_name, log_to_file=True, log_to_console=False):
             CONFIG['LOG_DIR'],
             f"{module_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
         )
-        file_handler = logging.FileHandler(log_filename, encoding='utf-8')
+        # 延迟到首次写日志时才创建文件，spawn 方式启动的子进程重新导入本模块时不会生成空日志文件
+        file_handler = logging.FileHandler(log_filename, encoding='utf-8', delay=True)
         file_handler.setFormatter(formatter)
         logger.addHandler(file_handler)
     
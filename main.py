@@ -2,6 +2,7 @@ import os
 import pandas as pd
 from config import CONFIG
 from logger_config import analysis_logger
+from utils import build_plot_context
 
 from data_processing import *
 from plot.indicators import *
@@ -35,6 +36,9 @@ def _load_data():
         if missing_columns:
             raise ValueError(f"缺少必要列: {missing_columns}")
         
+        # 加载时统一解析日期，后续绘图直接复用
+        df['date'] = pd.to_datetime(df['date'], format=CONFIG['DATE_FORMAT'])
+        
         analysis_logger.info(f"成功加载数据文件: {CONFIG['DATA_FILE']}")
         analysis_logger.info(f"数据行数: {len(df)}")
         
@@ -108,7 +112,7 @@ def _prepare_all_scores(df):
 #     return df_result
 
 
-def run_basic_analysis(df):
+def run_basic_analysis(df, ctx=None, signals=None):
     """运行基础分析"""
     analysis_logger.info("\n=== 运行基础分析 ===")
     
@@ -122,7 +126,7 @@ def run_basic_analysis(df):
         
         plot_right_skewed_score_distribution(df)
         
-        plot_strategy_performance(df)
+        plot_strategy_performance(df, ctx=ctx, signals=signals)
         
         analysis_logger.info("基础分析完成")
     
@@ -131,14 +135,17 @@ def run_basic_analysis(df):
         raise
 
 
-def run_cost_analysis(df):
+def run_cost_analysis(df, ctx=None, signals=None):
     """运行成本分析"""
     analysis_logger.info("\n=== 运行成本分析 ===")
     
     try:
-        plot_slope_strategy_with_costs(df)
-        plot_standard_score_strategy_with_costs(df)
-        plot_right_skewed_strategy_with_costs(df)
+        # 买入持有基准净值在各图表间共用
+        ctx = ctx or build_plot_context(df)
+        
+        plot_slope_strategy_with_costs(df, ctx=ctx, signals=signals)
+        plot_standard_score_strategy_with_costs(df, ctx=ctx, signals=signals)
+        plot_right_skewed_strategy_with_costs(df, ctx=ctx, signals=signals)
         analysis_logger.info("成本分析完成")
     
     except Exception as e:
@@ -146,7 +153,7 @@ def run_cost_analysis(df):
         raise
 
 
-def run_parameter_analysis(df):
+def run_parameter_analysis(df, ctx=None):
     """运行参数敏感性分析"""
     analysis_logger.info("\n=== 运行参数敏感性分析 ===")
     
@@ -159,8 +166,9 @@ def run_parameter_analysis(df):
         
         # 原有的N参数敏感性分析
         n_range = CONFIG['PARAMETER_SENSITIVITY_N_RANGE']
-        plot_parameter_sensitivity_strategy_curves(df, n_range=n_range)
-        sensitivity_results_n = plot_parameter_sensitivity_n(df, n_range=n_range)
+        # N 参数扫描只计算一次，策略曲线图与敏感性图共用
+        values_by_n = plot_parameter_sensitivity_strategy_curves(df, n_range=n_range, ctx=ctx)
+        sensitivity_results_n = plot_parameter_sensitivity_n(df, n_range=n_range, values_by_n=values_by_n)
         
         # 新增：M参数敏感性分析（优化策略）
         m_range = [450, 500, 550, 600, 650, 700, 750, 800]
@@ -181,17 +189,8 @@ def run_correlation_analysis(df):
     try:
         forward_days = CONFIG['FORWARD_DAYS']
         
-        # 标准分相关性
-        plot_score_vs_up_probability(df, forward_days=forward_days)
-        plot_score_vs_expected_return(df, forward_days=forward_days)
-        
-        # 修正标准分相关性
-        plot_modified_score_vs_up_probability(df, forward_days=forward_days)
-        plot_modified_score_vs_expected_return(df, forward_days=forward_days)
-        
-        # 右偏标准分相关性
-        plot_right_skewed_score_vs_up_probability(df, forward_days=forward_days)
-        plot_right_skewed_score_vs_expected_return(df, forward_days=forward_days)
+        # 标准分、修正标准分、右偏标准分相关性，六张图并行绘制
+        render_all_score_plots(df, forward_days=forward_days)
         
         analysis_logger.info("相关性分析完成")
     
@@ -200,13 +199,13 @@ def run_correlation_analysis(df):
         raise
 
 
-def run_strategy_statistics(df):
+def run_strategy_statistics(df, ctx=None, signals=None):
     """运行策略统计分析"""
     analysis_logger.info("\n=== 计算详细统计信息 ===")
     
     try:
         # plot_different_score_strategies_comparison(df, compute_stats=True)
-        strategies_data = plot_all_strategies_comparison(df)
+        strategies_data = plot_all_strategies_comparison(df, ctx=ctx, signals=signals)
         analysis_logger.info("策略统计分析完成")
     
     except Exception as e:
@@ -214,19 +213,21 @@ def run_strategy_statistics(df):
         raise
 
 
-def run_volume_optimized_analysis(df):
+def run_volume_optimized_analysis(df, ctx=None, signals=None):
     """运行交易量优化分析"""
     analysis_logger.info("\n=== 运行交易量优化分析 ===")
     
     try:
-        # 首先计算交易量相关性
-        from data_processing import calculate_volume_correlation
-        df = calculate_volume_correlation(df)
-        analysis_logger.info("交易量相关性计算完成")
+        # 首先计算交易量相关性（共享信号字典中已有全部交易量优化信号时无需计算）
+        volume_keys = ('volume_standard', 'volume_modified', 'volume_right_skewed')
+        if signals is None or not all(key in signals for key in volume_keys):
+            from data_processing import calculate_volume_correlation
+            df = calculate_volume_correlation(df)
+            analysis_logger.info("交易量相关性计算完成")
         
         # 绘制交易量优化策略对比
         from plot.volume_optimized_strategies import plot_volume_optimized_strategies_comparison
-        plot_volume_optimized_strategies_comparison(df)
+        plot_volume_optimized_strategies_comparison(df, ctx=ctx, signals=signals)
         
         analysis_logger.info("交易量优化分析完成")
     
@@ -235,13 +236,14 @@ def run_volume_optimized_analysis(df):
         raise
 
 
-def run_price_optimized_analysis(df):
+def run_price_optimized_analysis(df, ctx=None, signals=None):
     """运行价格优化分析"""
     analysis_logger.info("\n=== 运行价格优化分析 ===")
     
     try:
-        plot_price_optimized_strategies_comparison(df)
-        plot_price_optimized_right_skewed_with_costs(df)
+        ctx = ctx or build_plot_context(df)
+        plot_price_optimized_strategies_comparison(df, ctx=ctx, signals=signals)
+        plot_price_optimized_right_skewed_with_costs(df, ctx=ctx, signals=signals)
         
         analysis_logger.info("价格优化分析完成")
     
@@ -302,17 +304,23 @@ def main(analysis_config=None):
         # 一次性计算所有标准分（分别处理不同参数）
         df = _prepare_all_scores(df)
         
+        # 日期与买入持有基准净值与策略无关，计算一次供各分析复用
+        plot_ctx = build_plot_context(df)
+        
+        # 各分析共用的策略信号字典，某策略首次用到时才回测
+        all_signals = {}
+        
         # # 基础分析
         # if config['basic']:
-        #     run_basic_analysis(df)
+        #     run_basic_analysis(df, ctx=plot_ctx, signals=all_signals)
         
         # # 成本分析
         # if config['cost']:
-        #     run_cost_analysis(df)
+        #     run_cost_analysis(df, ctx=plot_ctx, signals=all_signals)
         
         # # 参数敏感性分析
         # if config['parameter']:
-        #     sensitivity_results = run_parameter_analysis(df)
+        #     sensitivity_results = run_parameter_analysis(df, ctx=plot_ctx)
         
         # # 相关性分析
         # if config['correlation']:
@@ -320,14 +328,14 @@ def main(analysis_config=None):
         
         # 策略统计分析
         if config['statistics']:
-            run_strategy_statistics(df)
+            run_strategy_statistics(df, ctx=plot_ctx, signals=all_signals)
 
         # if config.get('price_optimized', True):
-        #     run_price_optimized_analysis(df)
+        #     run_price_optimized_analysis(df, ctx=plot_ctx, signals=all_signals)
      
         # # 在适当位置添加交易量优化分析
         # if config.get('volume_optimized', True):  # 可以配置是否运行
-        #     run_volume_optimized_analysis(df)
+        #     run_volume_optimized_analysis(df, ctx=plot_ctx, signals=all_signals)
 
         # run_multi_market_analysis()
 
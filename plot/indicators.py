@@ -1,7 +1,9 @@
-import matplotlib.pyplot as plt
-import pandas as pd
+from plot_config import reuse_figure, save_figure
+import numpy as np
+from scipy.stats import describe
 from config import CONFIG
 from logger_config import analysis_logger
+from utils import as_float64, get_dates
 
 
 def _calculate_distribution_statistics(data, label):
@@ -9,23 +11,25 @@ def _calculate_distribution_statistics(data, label):
     计算分布统计信息并记录到日志
     
     参数:
-        data: 数据序列
+        data: 数据数组
         label: 标签名称
     
     返回:
         统计字典
     """
+    # 单次遍历计算各阶矩（无偏估计，与 pandas 的 std/skew/kurtosis 一致）
+    desc = describe(data, bias=False)
     stats = {
-        'Mean': data.mean(),
-        'Std': data.std(),
-        'Skewness': data.skew(),
-        'Kurtosis': data.kurtosis(),
-        'Data points': len(data)
+        'Mean': desc.mean,
+        'Std': np.sqrt(desc.variance),
+        'Skewness': desc.skewness,
+        'Kurtosis': desc.kurtosis,
+        'Data points': desc.nobs
     }
     
-    analysis_logger.info(f"\n{label} Statistics ({CONFIG['STATISTICS_START_DATE']} and after):")
+    analysis_logger.info("\n%s Statistics (%s and after):", label, CONFIG['STATISTICS_START_DATE'])
     for key, value in stats.items():
-        analysis_logger.info(f"{key}: {value:.6f}")
+        analysis_logger.info("%s: %.6f", key, value)
     analysis_logger.info("-" * 50)
     
     return stats
@@ -36,20 +40,23 @@ def _plot_distribution_histogram(data, xlabel, title, filename, color):
     绘制分布直方图
     
     参数:
-        data: 数据序列
+        data: 数据数组
         xlabel: x轴标签
         title: 图表标题
         filename: 保存文件名
         color: 柱子颜色
     """
-    plt.figure(figsize=(10, 6))
-    plt.hist(data, bins=50, alpha=0.7, color=color, edgecolor='black')
-    plt.xlabel(xlabel)
-    plt.ylabel('Frequency')
-    plt.title(title)
-    plt.grid(True, alpha=0.3)
-    plt.savefig(f'{CONFIG["PICTURE_DIR"]}/{filename}')
-    plt.close()
+    fig, ax = reuse_figure((10, 6))
+    # 先用 numpy 计算分箱计数，再用柱状图绘制
+    arr = np.ascontiguousarray(data, dtype=np.float64)
+    counts, edges = np.histogram(arr, bins=50)
+    ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge',
+            alpha=0.7, color=color, edgecolor='black')
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel('Frequency')
+    ax.set_title(title)
+    ax.grid(True, alpha=0.3)
+    save_figure(fig, f'{CONFIG["PICTURE_DIR"]}/{filename}')
 
 
 def _extract_and_plot_score_distribution(df, score_column, label, xlabel, 
@@ -67,16 +74,15 @@ def _extract_and_plot_score_distribution(df, score_column, label, xlabel,
         color: 柱子颜色
     """
     if score_column not in df.columns:
-        analysis_logger.warning(f"列 '{score_column}' 不存在于数据框中")
+        analysis_logger.warning("列 '%s' 不存在于数据框中", score_column)
         return
     
-    df_copy = df.copy()
-    df_copy['date'] = pd.to_datetime(df_copy['date'])
-    mask = df_copy['date'] >= CONFIG['STATISTICS_START_DATE']
-    score_data = df_copy.loc[mask, score_column].dropna()
+    mask = (get_dates(df) >= CONFIG['STATISTICS_START_DATE']).to_numpy()
+    score_data = as_float64(df, score_column)[mask]
+    score_data = score_data[~np.isnan(score_data)]
     
-    if score_data.empty:
-        analysis_logger.warning(f"没有有效的 {score_column} 数据")
+    if score_data.size == 0:
+        analysis_logger.warning("没有有效的 %s 数据", score_column)
         return
     
     # 计算并记录统计信息
@@ -85,7 +91,7 @@ def _extract_and_plot_score_distribution(df, score_column, label, xlabel,
     # 绘制直方图
     _plot_distribution_histogram(score_data, xlabel, title, filename, color)
     
-    analysis_logger.info(f"已生成图表: {filename}")
+    analysis_logger.info("已生成图表: %s", filename)
 
 
 def plot_slope_histogram(df):
@@ -100,24 +106,46 @@ def plot_slope_histogram(df):
     )
 
 
+def _moving_mean(arr, window):
+    """
+    基于累计和的滚动均值
+    
+    窗口内存在缺失值时结果为 NaN，与 pandas 的 rolling(window).mean() 一致
+    
+    参数:
+        arr: float64 数组
+        window: 窗口大小
+    
+    返回:
+        与 arr 等长的滚动均值数组
+    """
+    valid = ~np.isnan(arr)
+    value_sums = np.concatenate(([0.0], np.cumsum(np.where(valid, arr, 0.0))))
+    valid_counts = np.concatenate(([0], np.cumsum(valid)))
+    
+    result = np.full(len(arr), np.nan)
+    if len(arr) >= window:
+        sums = value_sums[window:] - value_sums[:-window]
+        counts = valid_counts[window:] - valid_counts[:-window]
+        result[window-1:] = np.where(counts == window, sums / window, np.nan)
+    return result
+
+
 def plot_slope_mean(df, window=250):
     """绘制RSRS斜率的滚动均值"""
-    df_copy = df.copy()
-    df_copy['date'] = pd.to_datetime(df_copy['date'])
-    df_copy = df_copy.set_index('date')
-    rolling_mean = df_copy['rsrs_slope'].rolling(window=window).mean()
-    
-    plt.figure(figsize=(12, 6))
-    plt.plot(rolling_mean.index, rolling_mean.values, linewidth=1.5, color='blue')
-    plt.title(f'RSRS Slope Rolling Mean (Window = {window} Days)')
-    plt.ylabel('RSRS Slope Rolling Mean')
-    plt.xlabel('date')
-    plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    plt.savefig(f'{CONFIG["PICTURE_DIR"]}/figure8_rsrs_slope_rolling_mean.png')
-    plt.close()
-    
-    analysis_logger.info(f"已生成图表: figure8_rsrs_slope_rolling_mean.png")
+    slopes = as_float64(df, 'rsrs_slope')
+    rolling_mean = _moving_mean(slopes, window)
+    
+    fig, ax = reuse_figure((12, 6))
+    ax.plot(get_dates(df), rolling_mean, linewidth=1.5, color='blue')
+    ax.set_title(f'RSRS Slope Rolling Mean (Window = {window} Days)')
+    ax.set_ylabel('RSRS Slope Rolling Mean')
+    ax.set_xlabel('date')
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    save_figure(fig, f'{CONFIG["PICTURE_DIR"]}/figure8_rsrs_slope_rolling_mean.png')
+    
+    analysis_logger.info("已生成图表: figure8_rsrs_slope_rolling_mean.png")
 
 
 def plot_standard_score_distribution(df):
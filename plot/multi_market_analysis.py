@@ -1,12 +1,61 @@
-import matplotlib.pyplot as plt
+from plot_config import reuse_figure, save_figure
 import pandas as pd
 import os
 from config import CONFIG
 from logger_config import analysis_logger
-from utils import calculate_portfolio_value, buy_hold_strategy
+from utils import calculate_portfolio_value, build_plot_context
 from strategy import backtest_price_optimized_right_skewed_strategy
 from backtest import calculate_strategy_statistics, log_strategy_statistics
 
+def _load_market_scores(market_key, data_file, market_name, n=18, m=600):
+    """
+    Load market data with all standard scores, using an on-disk cache
+    
+    The cache file is keyed by market, n, m and the data file's mtime, so
+    editing the CSV or changing parameters triggers a recomputation.
+    
+    Returns:
+        DataFrame with score columns, or None if required columns are missing
+    """
+    os.makedirs(CONFIG['CACHE_DIR'], exist_ok=True)
+    cache_path = os.path.join(
+        CONFIG['CACHE_DIR'],
+        f"{market_key}_n{n}_m{m}_{int(os.path.getmtime(data_file))}.pkl"
+    )
+    
+    if os.path.exists(cache_path):
+        df = pd.read_pickle(cache_path)
+        analysis_logger.info("Loaded cached %s scores: %s", market_name, cache_path)
+        return df
+    
+    df = pd.read_csv(data_file)
+    analysis_logger.info("Successfully loaded %s data: %d rows", market_name, len(df))
+    
+    # Check required columns
+    required_columns = ['date', 'close', 'high', 'low']
+    missing_columns = [col for col in required_columns if col not in df.columns]
+    if missing_columns:
+        analysis_logger.error("Missing required columns in %s: %s", data_file, missing_columns)
+        return None
+    
+    # Parse dates once so downstream plotting reuses them
+    df['date'] = pd.to_datetime(df['date'], format=CONFIG['DATE_FORMAT'])
+    
+    # Calculate all standard scores
+    from data_processing import (
+        calculate_rsrs_slope, calculate_standard_score, 
+        calculate_modified_standard_score, calculate_right_skewed_standard_score
+    )
+    
+    df = calculate_rsrs_slope(df, n=n)
+    df = calculate_standard_score(df, m=m)
+    df = calculate_modified_standard_score(df)
+    df = calculate_right_skewed_standard_score(df)
+    
+    df.to_pickle(cache_path)
+    return df
+
+
 def plot_strategy_on_market(market_key, market_config):
     """Run price optimized right skewed strategy on specified market"""
     
@@ -14,55 +63,39 @@ def plot_strategy_on_market(market_key, market_config):
     market_name = market_config['name']
     benchmark_name = market_config['benchmark_name']
     
-    analysis_logger.info(f"\n=== Running strategy on {market_name} ===")
+    analysis_logger.info("\n=== Running strategy on %s ===", market_name)
     
     try:
         # Load market data
         if not os.path.exists(data_file):
-            analysis_logger.warning(f"Data file not found: {data_file}")
+            analysis_logger.warning("Data file not found: %s", data_file)
             return None
             
-        df = pd.read_csv(data_file)
-        analysis_logger.info(f"Successfully loaded {market_name} data: {len(df)} rows")
-        
-        # Check required columns
-        required_columns = ['date', 'close', 'high', 'low']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        if missing_columns:
-            analysis_logger.error(f"Missing required columns in {data_file}: {missing_columns}")
+        # Load data and calculate all standard scores (using unified parameters n=18, m=600)
+        df = _load_market_scores(market_key, data_file, market_name, n=18, m=600)
+        if df is None:
             return None
         
-        # Calculate all standard scores (using unified parameters n=18, m=600)
-        from data_processing import (
-            calculate_rsrs_slope, calculate_standard_score, 
-            calculate_modified_standard_score, calculate_right_skewed_standard_score
-        )
-        
-        df = calculate_rsrs_slope(df, n=18)
-        df = calculate_standard_score(df, m=600)
-        df = calculate_modified_standard_score(df)
-        df = calculate_right_skewed_standard_score(df)
-        
         # Calculate strategy signals
         signals, _ = backtest_price_optimized_right_skewed_strategy(df)
         
         # Calculate net values
         values = calculate_portfolio_value(df, signals)
-        bh_signals = buy_hold_strategy(df)
-        bh_values = calculate_portfolio_value(df, bh_signals)
+        ctx = build_plot_context(df)
+        bh_values = ctx.bh_values
         
         # Plot
-        plt.figure(figsize=(12, 8))
-        dates = pd.to_datetime(df['date'])
+        fig, ax = reuse_figure((12, 8))
+        dates = ctx.dates
         
-        plt.plot(dates, bh_values, label=f'{benchmark_name} Buy & Hold', color='black', linewidth=2)
-        plt.plot(dates, values, label='Price Optimized Right Skewed Score Strategy', color='red', linewidth=1.5)
+        ax.plot(dates, bh_values, label=f'{benchmark_name} Buy & Hold', color='black', linewidth=2, rasterized=True)
+        ax.plot(dates, values, label='Price Optimized Right Skewed Score Strategy', color='red', linewidth=1.5, rasterized=True)
         
-        plt.title(f'Price Optimized Right Skewed Standard Score Strategy \non {market_name} Index', fontsize=14)
-        plt.ylabel('Net Value', fontsize=12)
-        plt.xlabel('Date', fontsize=12)
-        plt.legend(fontsize=10)
-        plt.grid(True, alpha=0.3)
+        ax.set_title(f'Price Optimized Right Skewed Standard Score Strategy \non {market_name} Index', fontsize=14)
+        ax.set_ylabel('Net Value', fontsize=12)
+        ax.set_xlabel('Date', fontsize=12)
+        ax.legend(fontsize=10)
+        ax.grid(True, alpha=0.3)
         
         # Save chart
         if market_key == 'sh50':
@@ -72,15 +105,15 @@ def plot_strategy_on_market(market_key, market_config):
         else:
             figure_name = f'strategy_{market_key}.png'
             
-        plt.tight_layout()
-        plt.savefig(f'{CONFIG["PICTURE_DIR"]}/{figure_name}')
-        plt.close()
+        fig.tight_layout()
+        save_figure(fig, f'{CONFIG["PICTURE_DIR"]}/{figure_name}')
         
         # Calculate statistics
-        stats = calculate_strategy_statistics(df, signals, f'Price Optimized Right Skewed on {market_name}')
+        stats = calculate_strategy_statistics(df, signals, f'Price Optimized Right Skewed on {market_name}',
+                                             values=values)
         log_strategy_statistics(stats)
         
-        analysis_logger.info(f"Generated chart: {figure_name}")
+        analysis_logger.info("Generated chart: %s", figure_name)
         
         return {
             'market': market_name,
@@ -90,7 +123,7 @@ def plot_strategy_on_market(market_key, market_config):
         }
         
     except Exception as e:
-        analysis_logger.error(f"Failed to run strategy on {market_name}: {e}")
+        analysis_logger.error("Failed to run strategy on %s: %s", market_name, e)
         return None
 
 def plot_multi_market_strategies():
@@ -126,10 +159,10 @@ def plot_multi_market_strategies():
             benchmark_value = result['benchmark_final_value']
             outperformance = (strategy_value - benchmark_value) / benchmark_value * 100
             
-            analysis_logger.info(f"{market_name}:")
-            analysis_logger.info(f"  Strategy Final Value: {strategy_value:.2f}")
-            analysis_logger.info(f"  Benchmark Final Value: {benchmark_value:.2f}")
-            analysis_logger.info(f"  Outperformance: {outperformance:+.1f}%")
+            analysis_logger.info("%s:", market_name)
+            analysis_logger.info("  Strategy Final Value: %.2f", strategy_value)
+            analysis_logger.info("  Benchmark Final Value: %.2f", benchmark_value)
+            analysis_logger.info("  Outperformance: %+.1f%%", outperformance)
             analysis_logger.info("-" * 40)
     
     return results
\ No newline at end of file
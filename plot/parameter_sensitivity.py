@@ -1,85 +1,126 @@
-import matplotlib.pyplot as plt
-import pandas as pd
+from plot_config import reuse_figure, save_figure
 import numpy as np
+import os
+from concurrent.futures import ProcessPoolExecutor
 from config import CONFIG
 from logger_config import analysis_logger
-from utils import calculate_portfolio_value, buy_hold_strategy
-from strategy import backtest_slope_strategy
-from data_processing import calculate_rsrs_slope
+from utils import calculate_portfolio_value, calculate_portfolio_final_value, build_plot_context
+from strategy import backtest_slope_strategy, backtest_standard_score_strategy_variants
+from data_processing import calculate_rsrs_slope, calculate_standard_score, calculate_volume_correlation
 
 
-def plot_parameter_sensitivity_strategy_curves(df, n_range=None):
+def _evaluate_slope_strategy_n(args):
+    """
+    计算单个N参数下斜率策略的净值序列（进程池工作函数）
+    
+    参数:
+        args: (df, n) 元组
+    
+    返回:
+        (n, values) 元组
+    """
+    df, n = args
+    df_with_slope = calculate_rsrs_slope(df, n=n)
+    slope_signals = backtest_slope_strategy(df_with_slope, buy_threshold=CONFIG['SLOPE_BUY_THRESHOLD'],
+                                           sell_threshold=CONFIG['SLOPE_SELL_THRESHOLD'])
+    return n, calculate_portfolio_value(df_with_slope, slope_signals)
+
+
+def _evaluate_n_range(df, n_range):
+    """
+    并行计算各N参数下斜率策略的净值序列
+    
+    参数:
+        df: 数据框
+        n_range: N参数范围
+    
+    返回:
+        {n: values} 字典
+    """
+    max_workers = min(len(n_range), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return dict(executor.map(_evaluate_slope_strategy_n, [(df, n) for n in n_range]))
+
+
+def plot_parameter_sensitivity_strategy_curves(df, n_range=None, ctx=None):
     """绘制不同N参数下的策略曲线"""
     n_range = n_range or CONFIG['PARAMETER_SENSITIVITY_N_RANGE']
     
-    plt.figure(figsize=(12, 8))
+    fig, ax = reuse_figure((12, 8))
     
-    bh_signals = buy_hold_strategy(df)
-    bh_values = calculate_portfolio_value(df, bh_signals)
-    dates = pd.to_datetime(df['date'])
-    plt.plot(dates, bh_values, label='HS300 Buy & Hold', color='black', linewidth=2)
+    ctx = ctx or build_plot_context(df)
+    dates = ctx.dates
+    ax.plot(dates, ctx.bh_values, label='HS300 Buy & Hold', color='black', linewidth=2)
     
     colors = ['blue', 'red', 'green', 'orange', 'purple', 'brown', 'pink', 'gray', 'olive', 'cyan', 'magenta']
     
     analysis_logger.info("\n参数敏感性分析 - 策略曲线:")
     
+    values_by_n = _evaluate_n_range(df, n_range)
+    
     for i, n in enumerate(n_range):
-        df_with_slope = calculate_rsrs_slope(df, n=n)
-        slope_signals = backtest_slope_strategy(df_with_slope, buy_threshold=CONFIG['SLOPE_BUY_THRESHOLD'],
-                                               sell_threshold=CONFIG['SLOPE_SELL_THRESHOLD'])
-        values = calculate_portfolio_value(df_with_slope, slope_signals)
+        values = values_by_n[n]
         
-        plt.plot(dates, values, label=f'N={n}', color=colors[i % len(colors)], linewidth=1.5)
+        ax.plot(dates, values, label=f'N={n}', color=colors[i % len(colors)], linewidth=1.5)
         
         final_value = values[-1]
-        analysis_logger.info(f"N={n}: 最终净值={final_value:.4f}")
+        analysis_logger.info("N=%s: 最终净值=%.4f", n, final_value)
     
-    plt.title('RSRS Slope Strategy Performance with Different N Parameters (N=14 to 24)', fontsize=14)
-    plt.ylabel('Net Value', fontsize=12)
-    plt.xlabel('Date', fontsize=12)
-    plt.legend(fontsize=8, loc='upper left')
-    plt.grid(True, alpha=0.3)
+    ax.set_title('RSRS Slope Strategy Performance with Different N Parameters (N=14 to 24)', fontsize=14)
+    ax.set_ylabel('Net Value', fontsize=12)
+    ax.set_xlabel('Date', fontsize=12)
+    ax.legend(fontsize=8, loc='upper left')
+    ax.grid(True, alpha=0.3)
     
     analysis_logger.info("-" * 50)
     
-    plt.tight_layout()
-    plt.savefig(f'{CONFIG["PICTURE_DIR"]}/figure11_slope_strategy_parameter_curves.png')
-    plt.close()
+    fig.tight_layout()
+    save_figure(fig, f'{CONFIG["PICTURE_DIR"]}/figure11_slope_strategy_parameter_curves.png')
     
     analysis_logger.info("已生成图表: figure11_slope_strategy_parameter_curves.png")
+    
+    return values_by_n
 
 
-def plot_parameter_sensitivity_n(df, n_range=None):
-    """绘制N参数敏感性分析图"""
+def plot_parameter_sensitivity_n(df, n_range=None, values_by_n=None):
+    """
+    绘制N参数敏感性分析图
+    
+    参数:
+        df: 数据框
+        n_range: N参数范围
+        values_by_n: 策略曲线图已算出的 {n: 净值序列}（可选，未提供时重新计算）
+    
+    返回:
+        {n: 最终净值} 字典
+    """
     n_range = n_range or CONFIG['PARAMETER_SENSITIVITY_N_RANGE']
     
     final_values = []
     
     analysis_logger.info("\n参数敏感性分析 - 最终净值:")
     
+    if values_by_n is None:
+        values_by_n = _evaluate_n_range(df, n_range)
+    
     for n in n_range:
-        df_with_slope = calculate_rsrs_slope(df, n=n)
-        slope_signals = backtest_slope_strategy(df_with_slope, buy_threshold=CONFIG['SLOPE_BUY_THRESHOLD'],
-                                               sell_threshold=CONFIG['SLOPE_SELL_THRESHOLD'])
-        values = calculate_portfolio_value(df_with_slope, slope_signals)
-        final_value = values[-1]
+        final_value = values_by_n[n][-1]
         final_values.append(final_value)
         
-        analysis_logger.info(f"N={n}: {final_value:.4f}")
+        analysis_logger.info("N=%s: %.4f", n, final_value)
     
     analysis_logger.info("-" * 50)
     
-    plt.figure(figsize=(12, 8))
-    plt.scatter(n_range, final_values, s=80, color='blue', alpha=0.7)
-    plt.title('RSRS Slope Strategy Parameter Sensitivity (N)', fontsize=14)
-    plt.xlabel('Parameter N (Slope Calculation Window)', fontsize=12)
-    plt.ylabel('Final Net Value', fontsize=12)
-    plt.grid(True, alpha=0.3)
-    plt.ylim(0, 12)
+    fig, ax = reuse_figure((12, 8))
+    ax.scatter(n_range, final_values, s=80, color='blue', alpha=0.7)
+    ax.set_title('RSRS Slope Strategy Parameter Sensitivity (N)', fontsize=14)
+    ax.set_xlabel('Parameter N (Slope Calculation Window)', fontsize=12)
+    ax.set_ylabel('Final Net Value', fontsize=12)
+    ax.grid(True, alpha=0.3)
+    ax.set_ylim(0, 12)
     
-    plt.tight_layout()
-    plt.savefig(f'{CONFIG["PICTURE_DIR"]}/figure12_slope_strategy_parameter_sensitivity_n.png')
-    plt.close()
+    fig.tight_layout()
+    save_figure(fig, f'{CONFIG["PICTURE_DIR"]}/figure12_slope_strategy_parameter_sensitivity_n.png')
     
     analysis_logger.info("已生成图表: figure12_slope_strategy_parameter_sensitivity_n.png")
     
@@ -92,65 +133,62 @@ def plot_optimized_strategies_parameter_sensitivity_m(df, m_range=None):
     m_range = m_range or [450, 500, 550, 600, 650, 700, 750, 800]
     
     # 存储结果
-    single_strategy_values = []      # 单指标策略
-    price_optimized_values = []      # 价格优化策略  
-    volume_optimized_values = []     # 交易量优化策略
+    single_strategy_values = np.empty(len(m_range))      # 单指标策略
+    price_optimized_values = np.empty(len(m_range))      # 价格优化策略  
+    volume_optimized_values = np.empty(len(m_range))     # 交易量优化策略
     
     analysis_logger.info("\n=== 优化策略参数敏感性分析 (M) ===")
     analysis_logger.info("M参数范围: " + ", ".join(map(str, m_range)))
     
-    for m in m_range:
-        analysis_logger.info(f"\n计算 M={m} 的策略表现...")
+    # 交易量相关性基于修正标准分，与M无关，循环外只计算一次
+    df_base = calculate_volume_correlation(df)
+    
+    for i, m in enumerate(m_range):
+        analysis_logger.info("\n计算 M=%s 的策略表现...", m)
+        
+        # 每个M只需重新计算标准分，三个策略共用同一数据框
+        df_m = calculate_standard_score(df_base, m=m)
+        
+        # 单指标、价格优化、交易量优化三种策略在一次遍历中生成信号
+        single_signals, price_signals, volume_signals = backtest_standard_score_strategy_variants(df_m)
         
+        # 只需最终净值，无需逐日净值序列
         # 1. 单指标策略（标准分策略）
-        from data_processing import calculate_standard_score
-        df_single = calculate_standard_score(df, m=m)
-        from strategy import backtest_standard_score_strategy
-        single_signals, _ = backtest_standard_score_strategy(df_single)
-        single_values = calculate_portfolio_value(df_single, single_signals)
-        single_strategy_values.append(single_values[-1])
+        single_strategy_values[i] = calculate_portfolio_final_value(df_m, single_signals)
         
         # 2. 价格优化策略
-        from strategy import backtest_price_optimized_standard_score_strategy
-        price_signals, _ = backtest_price_optimized_standard_score_strategy(df_single)
-        price_values = calculate_portfolio_value(df_single, price_signals)
-        price_optimized_values.append(price_values[-1])
+        price_optimized_values[i] = calculate_portfolio_final_value(df_m, price_signals)
         
         # 3. 交易量优化策略
-        from data_processing import calculate_volume_correlation
-        df_volume = calculate_volume_correlation(df_single)
-        from strategy import backtest_volume_optimized_standard_score_strategy
-        volume_signals, _ = backtest_volume_optimized_standard_score_strategy(df_volume)
-        volume_values = calculate_portfolio_value(df_volume, volume_signals)
-        volume_optimized_values.append(volume_values[-1])
+        volume_optimized_values[i] = calculate_portfolio_final_value(df_m, volume_signals)
         
-        analysis_logger.info(f"M={m}: 单指标={single_values[-1]:.3f}, 价格优化={price_values[-1]:.3f}, 交易量优化={volume_values[-1]:.3f}")
+        analysis_logger.info("M=%s: 单指标=%.3f, 价格优化=%.3f, 交易量优化=%.3f",
+                             m, single_strategy_values[i], price_optimized_values[i], volume_optimized_values[i])
     
     # 绘制图表
-    plt.figure(figsize=(12, 8))
+    fig, ax = reuse_figure((12, 8))
     
-    plt.plot(m_range, single_strategy_values, marker='o', label='Single Indicator', color='blue', linewidth=2, markersize=6)
-    plt.plot(m_range, price_optimized_values, marker='s', label='Price Optimized', color='red', linewidth=2, markersize=6)
-    plt.plot(m_range, volume_optimized_values, marker='^', label='Volume Correlation Optimized', color='green', linewidth=2, markersize=6)
+    ax.plot(m_range, single_strategy_values, marker='o', label='Single Indicator', color='blue', linewidth=2, markersize=6)
+    ax.plot(m_range, price_optimized_values, marker='s', label='Price Optimized', color='red', linewidth=2, markersize=6)
+    ax.plot(m_range, volume_optimized_values, marker='^', label='Volume Correlation Optimized', color='green', linewidth=2, markersize=6)
     
-    plt.title('Parameter Sensitivity of Different Optimized Indicator Strategies \n(Standard Score Calculation Period M)', fontsize=14)
-    plt.xlabel('Parameter M (Standard Score Calculation Window)', fontsize=12)
-    plt.ylabel('Final Net Value', fontsize=12)
-    plt.legend(fontsize=10)
-    plt.grid(True, alpha=0.3)
+    ax.set_title('Parameter Sensitivity of Different Optimized Indicator Strategies \n(Standard Score Calculation Period M)', fontsize=14)
+    ax.set_xlabel('Parameter M (Standard Score Calculation Window)', fontsize=12)
+    ax.set_ylabel('Final Net Value', fontsize=12)
+    ax.legend(fontsize=10)
+    ax.grid(True, alpha=0.3)
     
     # 添加数据标签
     for i, m in enumerate(m_range):
-        plt.annotate(f'{single_strategy_values[i]:.1f}', (m, single_strategy_values[i]), 
+        ax.annotate(f'{single_strategy_values[i]:.1f}', (m, single_strategy_values[i]), 
                     textcoords="offset points", xytext=(0,10), ha='center', fontsize=8)
-        plt.annotate(f'{price_optimized_values[i]:.1f}', (m, price_optimized_values[i]), 
+        ax.annotate(f'{price_optimized_values[i]:.1f}', (m, price_optimized_values[i]), 
                     textcoords="offset points", xytext=(0,10), ha='center', fontsize=8)
-        plt.annotate(f'{volume_optimized_values[i]:.1f}', (m, volume_optimized_values[i]), 
+        ax.annotate(f'{volume_optimized_values[i]:.1f}', (m, volume_optimized_values[i]), 
                     textcoords="offset points", xytext=(0,10), ha='center', fontsize=8)
     
-    plt.tight_layout()
-    plt.savefig(f'{CONFIG["PICTURE_DIR"]}/figure28_optimized_strategies_parameter_sensitivity_m.png')
-    plt.close()
+    fig.tight_layout()
+    save_figure(fig, f'{CONFIG["PICTURE_DIR"]}/figure28_optimized_strategies_parameter_sensitivity_m.png')
     
     # 记录详细结果（对应研报表7）
     analysis_logger.info("\n" + "="*60)
@@ -160,17 +198,18 @@ def plot_optimized_strategies_parameter_sensitivity_m(df, m_range=None):
     analysis_logger.info("-" * 55)
     
     for i, m in enumerate(m_range):
-        analysis_logger.info(f"{m:5d} | {single_strategy_values[i]:11.3f} | {price_optimized_values[i]:12.3f} | {volume_optimized_values[i]:15.3f}")
+        analysis_logger.info("%5d | %11.3f | %12.3f | %15.3f",
+                             m, single_strategy_values[i], price_optimized_values[i], volume_optimized_values[i])
     
     # 找到最佳参数
-    best_single_m = m_range[single_strategy_values.index(max(single_strategy_values))]
-    best_price_m = m_range[price_optimized_values.index(max(price_optimized_values))]
-    best_volume_m = m_range[volume_optimized_values.index(max(volume_optimized_values))]
+    best_single_m = m_range[int(np.argmax(single_strategy_values))]
+    best_price_m = m_range[int(np.argmax(price_optimized_values))]
+    best_volume_m = m_range[int(np.argmax(volume_optimized_values))]
     
     analysis_logger.info("\n最佳参数:")
-    analysis_logger.info(f"单指标策略最佳M: {best_single_m}, 净值: {max(single_strategy_values):.3f}")
-    analysis_logger.info(f"价格优化策略最佳M: {best_price_m}, 净值: {max(price_optimized_values):.3f}")
-    analysis_logger.info(f"交易量优化策略最佳M: {best_volume_m}, 净值: {max(volume_optimized_values):.3f}")
+    analysis_logger.info("单指标策略最佳M: %s, 净值: %.3f", best_single_m, single_strategy_values.max())
+    analysis_logger.info("价格优化策略最佳M: %s, 净值: %.3f", best_price_m, price_optimized_values.max())
+    analysis_logger.info("交易量优化策略最佳M: %s, 净值: %.3f", best_volume_m, volume_optimized_values.max())
     
     analysis_logger.info("Generated chart: figure28_optimized_strategies_parameter_sensitivity_m.png")
     
@@ -1,8 +1,12 @@
-import matplotlib.pyplot as plt
-import pandas as pd
+from plot_config import reuse_figure, save_figure
 import numpy as np
+import os
+import queue
+import logging.handlers
+from concurrent.futures import ProcessPoolExecutor
 from config import CONFIG
 from logger_config import analysis_logger
+from utils import as_float64
 
 
 def _calculate_score_and_return(df, score_column, forward_days=10):
@@ -15,59 +19,74 @@ def _calculate_score_and_return(df, score_column, forward_days=10):
         forward_days: 向前看的天数
     
     返回:
-        scores: 分数列表
-        up_probs: 上涨概率列表
-        expected_returns: 预期收益列表
+        scores: 分数数组
+        up_probs: 上涨概率数组 (int8, 1=上涨)
+        expected_returns: 预期收益数组
     """
-    scores = []
-    up_probs = []
-    expected_returns = []
-    
-    for i in range(len(df) - forward_days):
-        current_score = df[score_column].iloc[i]
-        if pd.isna(current_score):
-            continue
-        
-        future_prices = df['close'].iloc[i+1:i+forward_days+1]
-        if len(future_prices) < forward_days:
-            continue
-        
-        future_return = (future_prices.iloc[-1] - df['close'].iloc[i]) / df['close'].iloc[i]
-        up_prob = 1 if future_return > 0 else 0
-        
-        scores.append(current_score)
-        up_probs.append(up_prob)
-        expected_returns.append(future_return)
+    close = as_float64(df, 'close')
+    score = as_float64(df, score_column)
+    
+    # 第i日的未来收益为 (close[i+forward_days] - close[i]) / close[i]
+    base = close[:len(close) - forward_days]
+    future_return = (close[forward_days:] - base) / base
+    score = score[:len(base)]
+    
+    valid = ~np.isnan(score)
+    scores = score[valid]
+    expected_returns = future_return[valid]
+    up_probs = (expected_returns > 0).astype(np.int8)
     
     return scores, up_probs, expected_returns
 
 
-def _calculate_correlation(data, score_col, value_col):
+def _pearson(x, y):
+    """
+    计算皮尔逊相关系数（由各一阶和、二阶和及交叉积直接求得，不生成中心化副本）
+    
+    参数:
+        x: float64 数组
+        y: float64 数组
+    
+    返回:
+        相关系数，样本为空或方差为0时为 NaN
+    """
+    n = x.size
+    if n == 0:
+        return np.nan
+    sx, sy = x.sum(), y.sum()
+    sxx, syy, sxy = x @ x, y @ y, x @ y
+    cov_n = sxy - sx * sy / n
+    var_x_n = sxx - sx * sx / n
+    var_y_n = syy - sy * sy / n
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return cov_n / np.sqrt(var_x_n * var_y_n)
+
+
+def _calculate_correlation(scores, metrics):
     """
     计算相关系数
     
     参数:
-        data: 数据框，包含score_col和value_col两列
-        score_col: 分数列名
-        value_col: 值列名（上涨概率或收益）
+        scores: 分数数组
+        metrics: 值数组（上涨概率或收益）
     
     返回:
         corr_right: 右侧(score > 0)的相关系数
         corr_left: 左侧(score <= 0)的相关系数
         corr_total: 总体相关系数
     """
-    right_mask = data[score_col] > 0
-    left_mask = data[score_col] <= 0
+    right_mask = scores > 0
+    left_mask = ~right_mask
     
-    corr_right = data[right_mask][score_col].corr(data[right_mask][value_col]) if right_mask.sum() > 0 else np.nan
-    corr_left = data[left_mask][score_col].corr(data[left_mask][value_col]) if left_mask.sum() > 0 else np.nan
-    corr_total = data[score_col].corr(data[value_col])
+    corr_right = _pearson(scores[right_mask], metrics[right_mask])
+    corr_left = _pearson(scores[left_mask], metrics[left_mask])
+    corr_total = _pearson(scores, metrics)
     
     return corr_right, corr_left, corr_total
 
 
 def _plot_score_analysis(df, score_column, metric_type, forward_days, 
-                         bin_width, title_prefix, figure_name, color):
+                         bin_width, title_prefix, figure_name, color, logger=None):
     """
     通用的分数分析绘图函数
     
@@ -80,65 +99,73 @@ def _plot_score_analysis(df, score_column, metric_type, forward_days,
         title_prefix: 标题前缀
         figure_name: 图片保存名
         color: 柱子颜色
+        logger: 日志记录器（默认 analysis_logger）
     """
+    logger = logger or analysis_logger
+    
     if score_column not in df.columns:
-        analysis_logger.warning(f"列 '{score_column}' 不存在于数据框中")
+        logger.warning(f"列 '{score_column}' 不存在于数据框中")
         return
     
     scores, up_probs, expected_returns = _calculate_score_and_return(df, score_column, forward_days)
     
-    if not scores:
-        analysis_logger.warning(f"没有有效的 {score_column} 数据")
+    if scores.size == 0:
+        logger.warning(f"没有有效的 {score_column} 数据")
         return
     
     if metric_type == 'up_probability':
-        data = pd.DataFrame({'score': scores, 'metric': up_probs})
+        metrics = up_probs.astype(np.float64)
         metric_label = f'Up Probability (Next {forward_days} Days)'
         correlation_label = f'{title_prefix} Score vs Up Probability'
     else:  # expected_return
-        data = pd.DataFrame({'score': scores, 'metric': expected_returns})
+        metrics = expected_returns
         metric_label = f'Expected Return (Next {forward_days} Days)'
         correlation_label = f'{title_prefix} Score vs Expected Return'
     
-    # 计算分箱统计
-    min_score = data['score'].min()
-    max_score = data['score'].max()
+    # 计算分箱统计：区间为右闭 (left, left + bin_width]，与 pd.cut 的划分一致
+    min_score = scores.min()
+    max_score = scores.max()
     bins = np.arange(min_score, max_score + bin_width, bin_width)
-    data['score_bin'] = pd.cut(data['score'], bins=bins)
-    bin_stats = data.groupby('score_bin').agg({'metric': 'mean'}).reset_index()
-    bin_stats['bin_left'] = [interval.left for interval in bin_stats['score_bin']]
+    n_bins = len(bins) - 1
+    # side='left' 使恰好落在边界上的分数归入左侧分箱（右闭区间）
+    bin_idx = np.searchsorted(bins, scores, side='left') - 1
+    in_range = (bin_idx >= 0) & (bin_idx < n_bins)
+    bin_sums = np.bincount(bin_idx[in_range], weights=metrics[in_range], minlength=n_bins)
+    bin_counts = np.bincount(bin_idx[in_range], minlength=n_bins)
+    with np.errstate(invalid='ignore'):
+        bin_means = bin_sums / bin_counts  # 空分箱为 NaN，不绘制柱子
+    bin_left = bins[:-1]
     
     # 计算相关系数
-    corr_right, corr_left, corr_total = _calculate_correlation(data, 'score', 'metric')
+    corr_right, corr_left, corr_total = _calculate_correlation(scores, metrics)
     
     # 记录到日志
-    analysis_logger.info(f"\nCorrelation coefficients - {correlation_label}:")
-    analysis_logger.info(f"Right side (score > 0): {corr_right:.4f}")
-    analysis_logger.info(f"Left side (score <= 0): {corr_left:.4f}")
-    analysis_logger.info(f"Total: {corr_total:.4f}")
-    analysis_logger.info("-" * 50)
+    logger.info(f"\nCorrelation coefficients - {correlation_label}:")
+    logger.info(f"Right side (score > 0): {corr_right:.4f}")
+    logger.info(f"Left side (score <= 0): {corr_left:.4f}")
+    logger.info(f"Total: {corr_total:.4f}")
+    logger.info("-" * 50)
     
     # 绘图
-    plt.figure(figsize=(14, 8))
-    plt.bar(bin_stats['bin_left'], bin_stats['metric'], width=bin_width, 
+    fig, ax = reuse_figure((14, 8))
+    ax.bar(bin_left, bin_means, width=bin_width, 
             alpha=0.7, color=color, edgecolor='black')
-    plt.xlabel(f'{title_prefix} Score')
-    plt.ylabel(metric_label)
-    plt.title(f'{title_prefix} Score vs {metric_label} - Bin Width: {bin_width}')
-    plt.grid(True, alpha=0.3, axis='y')
+    ax.set_xlabel(f'{title_prefix} Score')
+    ax.set_ylabel(metric_label)
+    ax.set_title(f'{title_prefix} Score vs {metric_label} - Bin Width: {bin_width}')
+    ax.grid(True, alpha=0.3, axis='y')
     
     # 对于收益图表，添加零线
     if metric_type == 'expected_return':
-        plt.axhline(y=0, color='black', linestyle='-', alpha=0.5)
+        ax.axhline(y=0, color='black', linestyle='-', alpha=0.5)
     
-    plt.tight_layout()
-    plt.savefig(f'{CONFIG["PICTURE_DIR"]}/{figure_name}')
-    plt.close()
+    fig.tight_layout()
+    save_figure(fig, f'{CONFIG["PICTURE_DIR"]}/{figure_name}')
     
-    analysis_logger.info(f"已生成图表: {figure_name}")
+    logger.info(f"已生成图表: {figure_name}")
 
 
-def plot_score_vs_up_probability(df, forward_days=None):
+def plot_score_vs_up_probability(df, forward_days=None, logger=None):
     """绘制标准分与上涨概率"""
     forward_days = forward_days or CONFIG['FORWARD_DAYS']
     _plot_score_analysis(
@@ -146,11 +173,12 @@ def plot_score_vs_up_probability(df, forward_days=None):
         forward_days, bin_width=CONFIG['BIN_WIDTH_PROBABILITY'],
         title_prefix='RSRS Standard',
         figure_name='figure16_score_vs_up_probability.png',
-        color='blue'
+        color='blue',
+        logger=logger
     )
 
 
-def plot_score_vs_expected_return(df, forward_days=None):
+def plot_score_vs_expected_return(df, forward_days=None, logger=None):
     """绘制标准分与预期收益"""
     forward_days = forward_days or CONFIG['FORWARD_DAYS']
     _plot_score_analysis(
@@ -158,11 +186,12 @@ def plot_score_vs_expected_return(df, forward_days=None):
         forward_days, bin_width=CONFIG['BIN_WIDTH_RETURN'],
         title_prefix='RSRS Standard',
         figure_name='figure17_score_vs_expected_return.png',
-        color='green'
+        color='green',
+        logger=logger
     )
 
 
-def plot_modified_score_vs_up_probability(df, forward_days=None):
+def plot_modified_score_vs_up_probability(df, forward_days=None, logger=None):
     """绘制修正标准分与上涨概率"""
     forward_days = forward_days or CONFIG['FORWARD_DAYS']
     _plot_score_analysis(
@@ -170,11 +199,12 @@ def plot_modified_score_vs_up_probability(df, forward_days=None):
         forward_days, bin_width=CONFIG['BIN_WIDTH_PROBABILITY'],
         title_prefix='Modified RSRS Standard',
         figure_name='figure18_modified_score_vs_up_probability.png',
-        color='purple'
+        color='purple',
+        logger=logger
     )
 
 
-def plot_modified_score_vs_expected_return(df, forward_days=None):
+def plot_modified_score_vs_expected_return(df, forward_days=None, logger=None):
     """绘制修正标准分与预期收益"""
     forward_days = forward_days or CONFIG['FORWARD_DAYS']
     _plot_score_analysis(
@@ -182,11 +212,12 @@ def plot_modified_score_vs_expected_return(df, forward_days=None):
         forward_days, bin_width=CONFIG['BIN_WIDTH_RETURN'],
         title_prefix='Modified RSRS Standard',
         figure_name='figure19_modified_score_vs_expected_return.png',
-        color='orange'
+        color='orange',
+        logger=logger
     )
 
 
-def plot_right_skewed_score_vs_up_probability(df, forward_days=None):
+def plot_right_skewed_score_vs_up_probability(df, forward_days=None, logger=None):
     """绘制右偏标准分与上涨概率"""
     forward_days = forward_days or CONFIG['FORWARD_DAYS']
     _plot_score_analysis(
@@ -194,11 +225,12 @@ def plot_right_skewed_score_vs_up_probability(df, forward_days=None):
         forward_days, bin_width=CONFIG['BIN_WIDTH_PROBABILITY'],
         title_prefix='Right Skewed RSRS Standard',
         figure_name='figure21_right_skewed_score_vs_up_probability.png',
-        color='brown'
+        color='brown',
+        logger=logger
     )
 
 
-def plot_right_skewed_score_vs_expected_return(df, forward_days=None):
+def plot_right_skewed_score_vs_expected_return(df, forward_days=None, logger=None):
     """绘制右偏标准分与预期收益"""
     forward_days = forward_days or CONFIG['FORWARD_DAYS']
     _plot_score_analysis(
@@ -206,5 +238,64 @@ def plot_right_skewed_score_vs_expected_return(df, forward_days=None):
         forward_days, bin_width=CONFIG['BIN_WIDTH_RETURN'],
         title_prefix='Right Skewed RSRS Standard',
         figure_name='figure22_right_skewed_score_vs_expected_return.png',
-        color='darkred'
-    )
\ No newline at end of file
+        color='darkred',
+        logger=logger
+    )
+
+
+def _render_score_plot(args):
+    """
+    绘制单张分数分析图（进程池工作函数）
+    
+    日志写入子进程内独立的记录器，以 (级别, 消息) 列表返回主进程后按顺序输出，
+    避免多进程日志交错，且不改动 analysis_logger 的处理器
+    
+    参数:
+        args: (plot_func, df, forward_days) 元组
+    
+    返回:
+        该图产生的 (级别, 消息) 列表
+    """
+    plot_func, df, forward_days = args
+    records = queue.SimpleQueue()
+    handler = logging.handlers.QueueHandler(records)
+    logger = logging.getLogger('analysis.score_worker')
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        plot_func(df, forward_days=forward_days, logger=logger)
+    finally:
+        logger.removeHandler(handler)
+    
+    messages = []
+    while not records.empty():
+        record = records.get()
+        messages.append((record.levelno, record.getMessage()))
+    return messages
+
+
+def render_all_score_plots(df, forward_days=None):
+    """
+    并行绘制六张分数与上涨概率/预期收益的关系图
+    
+    参数:
+        df: 数据框
+        forward_days: 向前看的天数
+    """
+    forward_days = forward_days or CONFIG['FORWARD_DAYS']
+    plot_funcs = [
+        plot_score_vs_up_probability,
+        plot_score_vs_expected_return,
+        plot_modified_score_vs_up_probability,
+        plot_modified_score_vs_expected_return,
+        plot_right_skewed_score_vs_up_probability,
+        plot_right_skewed_score_vs_expected_return,
+    ]
+    
+    max_workers = min(len(plot_funcs), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        jobs = [(plot_func, df, forward_days) for plot_func in plot_funcs]
+        for messages in executor.map(_render_score_plot, jobs):
+            for level, message in messages:
+                analysis_logger.log(level, message)
@@ -0,0 +1,62 @@
+import matplotlib
+
+# 各图表直接构造 Figure，保存时按文件格式选择渲染器，不依赖 pyplot 后端；
+# 此处设置 Agg 只是保证其他代码导入 pyplot 时也不会启动图形界面
+matplotlib.use('Agg')
+
+import os
+import threading
+from matplotlib.figure import Figure
+
+# 简化路径：丢弃在当前分辨率下不可见的折线顶点，加快长时间序列的渲染
+matplotlib.rcParams['path.simplify'] = True
+matplotlib.rcParams['path.simplify_threshold'] = 1.0
+matplotlib.rcParams['agg.path.chunksize'] = 10000
+
+# 按尺寸缓存的 Figure，各图表之间复用以避免反复创建画布；
+# 直接构造 Figure 而不经过 pyplot，且每个线程各自缓存，不共享全局图表状态
+_local = threading.local()
+
+
+def reuse_figure(figsize):
+    """
+    获取当前线程中指定尺寸的复用 Figure 及其坐标轴，坐标轴清空后返回
+    
+    参数:
+        figsize: 图片尺寸 (宽, 高)
+    
+    返回:
+        (fig, ax) 元组
+    """
+    figures = getattr(_local, 'figures', None)
+    if figures is None:
+        figures = _local.figures = {}
+    
+    if figsize not in figures:
+        fig = Figure(figsize=figsize)
+        figures[figsize] = (fig, fig.add_subplot())
+    fig, ax = figures[figsize]
+    ax.clear()
+    return fig, ax
+
+
+def save_figure(fig, path, **savefig_kwargs):
+    """
+    保存图表，画布与坐标轴保留供下一张同尺寸的图复用
+    
+    PNG 默认使用最低压缩级别：文件略大，但编码速度快数倍
+    
+    参数:
+        fig: Figure 对象
+        path: 保存路径
+        savefig_kwargs: 传递给 savefig 的其他参数
+    """
+    fmt = savefig_kwargs.get('format')
+    if fmt is None and isinstance(path, (str, os.PathLike)):
+        fmt = os.path.splitext(os.fspath(path))[1].lstrip('.')
+    fmt = (fmt or matplotlib.rcParams['savefig.format']).lower()
+    
+    # pil_kwargs 只有基于 Pillow 的格式接受，SVG/PDF 等格式传入会报错
+    if fmt == 'png':
+        savefig_kwargs.setdefault('pil_kwargs', {'compress_level': 1})
+    fig.savefig(path, **savefig_kwargs)
@@ -2,6 +2,7 @@ import numpy as np
 import pandas as pd
 from config import CONFIG
 from logger_config import analysis_logger
+from utils import as_float64
 
 
 def _get_start_index(df):
@@ -16,6 +17,138 @@ def _get_start_index(df):
         return 0
 
 
+def _slope_step(position, slope, buy_threshold, sell_threshold, buy_allowed=True):
+    """
+    斜率规则的单日持仓更新（斜率策略及各分数策略的回退规则共用）
+    
+    参数:
+        position: 当前持仓 (0/1)
+        slope: 当日斜率
+        buy_threshold: 买入阈值
+        sell_threshold: 卖出阈值
+        buy_allowed: 是否允许买入（价格优化策略的趋势过滤）
+    
+    返回:
+        更新后的持仓
+    """
+    if np.isnan(slope):
+        return position
+    if position == 0 and slope > buy_threshold and buy_allowed:
+        return 1
+    if position == 1 and slope < sell_threshold:
+        return 0
+    return position
+
+
+def _score_step(position, score, slope, threshold, buy_threshold, sell_threshold, score_missing):
+    """
+    标准分类策略的单日持仓更新
+    
+    参数:
+        position: 当前持仓 (0/1)
+        score: 当日分数
+        slope: 当日斜率（分数缺失时回退使用）
+        threshold: 分数阈值
+        buy_threshold: 斜率买入阈值
+        sell_threshold: 斜率卖出阈值
+        score_missing: 分数是否尚未可用
+    
+    返回:
+        更新后的持仓
+    """
+    # 分数计算未完成时，使用斜率作为回退
+    if score_missing:
+        return _slope_step(position, slope, buy_threshold, sell_threshold)
+    if position == 0 and score > threshold:
+        return 1
+    if position == 1 and score < -threshold:
+        return 0
+    return position
+
+
+def _price_step(position, score, slope, threshold, trend_ok, score_missing):
+    """
+    价格优化策略的单日持仓更新：买入需满足价格趋势过滤
+    
+    参数:
+        position: 当前持仓 (0/1)
+        score: 当日分数
+        slope: 当日斜率（分数缺失时回退使用）
+        threshold: 分数阈值
+        trend_ok: 价格趋势是否允许买入
+        score_missing: 分数是否尚未可用
+    
+    返回:
+        更新后的持仓
+    """
+    if score_missing:
+        return _slope_step(position, slope, CONFIG['SLOPE_BUY_THRESHOLD'],
+                           CONFIG['SLOPE_SELL_THRESHOLD'], buy_allowed=trend_ok)
+    if position == 0 and score > threshold and trend_ok:
+        return 1
+    if position == 1 and score < -threshold:
+        return 0
+    return position
+
+
+def _volume_step(position, score, volume_corr, slope, threshold, score_missing):
+    """
+    交易量优化策略的单日持仓更新：买入需交易量相关性为正
+    
+    参数:
+        position: 当前持仓 (0/1)
+        score: 当日分数
+        volume_corr: 当日交易量相关性
+        slope: 当日斜率（分数或相关性缺失时回退使用）
+        threshold: 分数阈值
+        score_missing: 分数是否尚未可用
+    
+    返回:
+        更新后的持仓
+    """
+    if score_missing or np.isnan(volume_corr):
+        return _slope_step(position, slope, CONFIG['SLOPE_BUY_THRESHOLD'], CONFIG['SLOPE_SELL_THRESHOLD'])
+    if position == 0 and score > threshold and volume_corr > 0:
+        return 1
+    if position == 1 and score < -threshold:
+        return 0
+    return position
+
+
+def _price_trend_ok(ma, i, ma_window, compare_days):
+    """
+    价格趋势过滤：均线数据不足时不过滤，否则要求前一日均线高于前 compare_days 日均线
+    
+    参数:
+        ma: 收盘价均线数组
+        i: 当前索引
+        ma_window: 均线窗口
+        compare_days: 比较间隔天数
+    
+    返回:
+        是否允许买入
+    """
+    # 检查是否有足够的均线数据进行比较
+    has_ma_data = (i >= ma_window + compare_days - 1 and 
+                  not np.isnan(ma[i-1]) and 
+                  not np.isnan(ma[i-compare_days]))
+    if not has_ma_data:
+        return True
+    
+    # 趋势判断：前一日MA20 > 前三日MA20
+    ma_prev = ma[i-1]      # 前一日MA20
+    ma_prev_3 = ma[i-compare_days]  # 前三日MA20
+    ma_20_current = ma[i]
+    ma_prev_2 = ma[i-2]
+    ma_prev_4 = ma[i-compare_days-1]
+    is_uptrend = ma_prev > ma_prev_3
+    # is_uptrend = ma_20_current > ma_prev and ma_20_current > ma_prev_2 and ma_20_current > ma_prev_3
+    # is_uptrend = ma_20_current > ma_prev_3
+    # is_uptrend = ma_20_current > ma_prev and ma_prev > ma_prev_2 and ma_prev_2 > ma_prev_3
+    # is_uptrend = ma_prev > ma_prev_2 and ma_prev_2 > ma_prev_3 and ma_prev_3 > ma_prev_4
+    return is_uptrend
+
+
 def _generate_slope_signals(df, buy_threshold, sell_threshold):
     """
     生成斜率信号
@@ -31,29 +164,20 @@ def _generate_slope_signals(df, buy_threshold, sell_threshold):
     signals = []
     position = 0
     start_idx = _get_start_index(df)
+    slopes = as_float64(df, 'rsrs_slope')
     
     for i in range(len(df)):
         if i < start_idx:
             signals.append(0)
             continue
         
-        slope = df['rsrs_slope'].iloc[i]
-        
-        if np.isnan(slope):
-            signals.append(position)
-            continue
-        
-        if position == 0 and slope > buy_threshold:
-            position = 1
-        elif position == 1 and slope < sell_threshold:
-            position = 0
-        
+        position = _slope_step(position, slopes[i], buy_threshold, sell_threshold)
         signals.append(position)
     
     return signals
 
 
-def _generate_score_signals(df, score_column, threshold, buy_threshold=1.0, sell_threshold=0.8):
+def _generate_score_signals(df, score_column, threshold, buy_threshold=None, sell_threshold=None):
     """
     生成分数信号
     
@@ -67,37 +191,28 @@ def _generate_score_signals(df, score_column, threshold, buy_threshold=1.0, sell
     返回:
         signals 列表
     """
+    buy_threshold = buy_threshold or CONFIG['SLOPE_BUY_THRESHOLD']
+    sell_threshold = sell_threshold or CONFIG['SLOPE_SELL_THRESHOLD']
+    
     signals = []
     position = 0
     
     start_idx = _get_start_index(df)
     first_score_idx = df[score_column].first_valid_index()
     
+    # 循环前一次性取出各列数组，避免逐行 .iloc 访问
+    scores = as_float64(df, score_column)
+    slopes = as_float64(df, 'rsrs_slope')
+    
     for i in range(len(df)):
         if i < start_idx:
             signals.append(0)
             continue
         
-        score = df[score_column].iloc[i]
-        slope = df['rsrs_slope'].iloc[i]
-        
-        # 分数计算未完成时，使用斜率作为回退
-        if i < first_score_idx or pd.isna(score):
-            if np.isnan(slope):
-                signals.append(position)
-                continue
-            
-            if position == 0 and slope > buy_threshold:
-                position = 1
-            elif position == 1 and slope < sell_threshold:
-                position = 0
-        else:
-            # 使用分数信号
-            if position == 0 and score > threshold:
-                position = 1
-            elif position == 1 and score < -threshold:
-                position = 0
-        
+        score = scores[i]
+        score_missing = i < first_score_idx or np.isnan(score)
+        position = _score_step(position, score, slopes[i], threshold,
+                               buy_threshold, sell_threshold, score_missing)
         signals.append(position)
     
     return signals
@@ -186,34 +301,20 @@ def _generate_volume_optimized_signals(df, base_score_column, threshold):
     start_idx = _get_start_index(df)
     first_score_idx = df[base_score_column].first_valid_index()
     
+    # 循环前一次性取出各列数组，避免逐行 .iloc 访问
+    scores = as_float64(df, base_score_column)
+    volume_corrs = as_float64(df, 'volume_correlation')
+    slopes = as_float64(df, 'rsrs_slope')
+    
     for i in range(len(df)):
         if i < start_idx:
             signals.append(0)
             continue
         
-        score = df[base_score_column].iloc[i]
-        volume_corr = df['volume_correlation'].iloc[i]
-        slope = df['rsrs_slope'].iloc[i]  # 需要斜率作为回退
-        
-        # 分数计算未完成时，使用斜率作为回退（与原策略保持一致）
-        if i < first_score_idx or pd.isna(score) or pd.isna(volume_corr):
-            if np.isnan(slope):
-                signals.append(position)
-                continue
-            
-            # 使用斜率回退逻辑
-            if position == 0 and slope > CONFIG['SLOPE_BUY_THRESHOLD']:
-                position = 1
-            elif position == 1 and slope < CONFIG['SLOPE_SELL_THRESHOLD']:
-                position = 0
-        else:
-            # 使用分数信号 + 交易量过滤
-            if position == 0 and score > threshold and volume_corr > 0:
-            # if position == 0 and score > threshold:
-                position = 1
-            elif position == 1 and score < -threshold:
-                position = 0
-        
+        score = scores[i]
+        score_missing = i < first_score_idx or np.isnan(score)
+        # 分数或相关性不可用时使用斜率回退，否则使用分数信号 + 交易量过滤
+        position = _volume_step(position, score, volume_corrs[i], slopes[i], threshold, score_missing)
         signals.append(position)
     
     return signals
@@ -260,54 +361,21 @@ def _generate_price_optimized_signals(df, base_score_column, threshold, ma_windo
     start_idx = _get_start_index(df)
     first_score_idx = df[base_score_column].first_valid_index()
     
-    # 预先计算20日均线
-    df_copy = df.copy()
-    df_copy['ma_20'] = df_copy['close'].rolling(window=ma_window).mean()
+    # 预先计算20日均线，并一次性取出各列数组，避免逐行 .iloc 访问
+    ma_20 = df['close'].rolling(window=ma_window).mean().to_numpy(dtype=np.float64)
+    scores = as_float64(df, base_score_column)
+    slopes = as_float64(df, 'rsrs_slope')
     
     for i in range(len(df)):
         if i < start_idx:
             signals.append(0)
             continue
         
-        score = df_copy[base_score_column].iloc[i]
-        slope = df_copy['rsrs_slope'].iloc[i]
-        ma_20_current = df_copy['ma_20'].iloc[i]
-        
-        # 检查是否有足够的均线数据进行比较
-        has_ma_data = (i >= ma_window + compare_days - 1 and 
-                      not pd.isna(df_copy['ma_20'].iloc[i-1]) and 
-                      not pd.isna(df_copy['ma_20'].iloc[i-compare_days]))
-        
-        # 趋势判断：前一日MA20 > 前三日MA20
-        is_uptrend = False
-        if has_ma_data:
-            ma_prev = df_copy['ma_20'].iloc[i-1]      # 前一日MA20
-            ma_prev_2 = df_copy['ma_20'].iloc[i-2]
-            ma_prev_3 = df_copy['ma_20'].iloc[i-compare_days]  # 前三日MA20
-            ma_prev_4 = df_copy['ma_20'].iloc[i-compare_days-1]
-            is_uptrend = ma_prev > ma_prev_3
-            # is_uptrend = ma_20_current > ma_prev and ma_20_current > ma_prev_2 and ma_20_current > ma_prev_3
-            # is_uptrend = ma_20_current > ma_prev_3
-            # is_uptrend = ma_20_current > ma_prev and ma_prev > ma_prev_2 and ma_prev_2 > ma_prev_3
-            # is_uptrend = ma_prev > ma_prev_2 and ma_prev_2 > ma_prev_3 and ma_prev_3 > ma_prev_4
-        
-        # 分数计算未完成时，使用斜率作为回退（不应用趋势过滤）
-        if i < first_score_idx or pd.isna(score):
-            if np.isnan(slope):
-                signals.append(position)
-                continue
-            
-            if position == 0 and slope > CONFIG['SLOPE_BUY_THRESHOLD'] and (not has_ma_data or is_uptrend):
-                position = 1
-            elif position == 1 and slope < CONFIG['SLOPE_SELL_THRESHOLD']:
-                position = 0
-        else:
-            # 使用分数信号 + 价格趋势过滤
-            if position == 0 and score > threshold and (not has_ma_data or is_uptrend):
-                position = 1
-            elif position == 1 and score < -threshold:
-                position = 0
-        
+        score = scores[i]
+        score_missing = i < first_score_idx or np.isnan(score)
+        trend_ok = _price_trend_ok(ma_20, i, ma_window, compare_days)
+        # 分数不可用时使用斜率回退，否则使用分数信号；两者买入均需通过价格趋势过滤
+        position = _price_step(position, score, slopes[i], threshold, trend_ok, score_missing)
         signals.append(position)
     
     return signals
@@ -328,4 +396,120 @@ def backtest_price_optimized_right_skewed_strategy(df, threshold=None):
     """价格优化的右偏标准分策略"""
     threshold = threshold or CONFIG['RIGHT_SKEWED_SCORE_PARAMS']['threshold']
     signals = _generate_price_optimized_signals(df, 'right_skewed_standard_score', threshold)
-    return signals, df
\ No newline at end of file
+    return signals, df
+
+
+def _generate_standard_score_signal_variants(df, threshold, ma_window=None, compare_days=None):
+    """
+    单次遍历同时生成标准分、价格优化、交易量优化三种信号
+    
+    各策略的单日规则与 _generate_score_signals、_generate_price_optimized_signals、
+    _generate_volume_optimized_signals 共用 _score_step、_price_step、_volume_step，
+    各列只转换为数组一次，三种策略共用同一次遍历。
+    
+    参数:
+        df: 包含 standard_score、rsrs_slope、close、volume_correlation 列的 DataFrame
+        threshold: 分数阈值
+        ma_window: 均线窗口
+        compare_days: 比较间隔天数
+    
+    返回:
+        (single_signals, price_signals, volume_signals) 元组
+    """
+    ma_window = ma_window or CONFIG['PRICE_TREND_WINDOW']
+    compare_days = compare_days or CONFIG['PRICE_COMPARE_DAYS']
+    slope_buy = CONFIG['SLOPE_BUY_THRESHOLD']
+    slope_sell = CONFIG['SLOPE_SELL_THRESHOLD']
+    
+    start_idx = _get_start_index(df)
+    first_score_idx = df['standard_score'].first_valid_index()
+    
+    scores = as_float64(df, 'standard_score')
+    slopes = as_float64(df, 'rsrs_slope')
+    volume_corrs = as_float64(df, 'volume_correlation')
+    ma = df['close'].rolling(window=ma_window).mean().to_numpy(dtype=np.float64)
+    
+    single_signals, price_signals, volume_signals = [], [], []
+    single_pos = price_pos = volume_pos = 0
+    
+    for i in range(len(df)):
+        if i < start_idx:
+            single_signals.append(0)
+            price_signals.append(0)
+            volume_signals.append(0)
+            continue
+        
+        score = scores[i]
+        slope = slopes[i]
+        score_missing = i < first_score_idx or np.isnan(score)
+        trend_ok = _price_trend_ok(ma, i, ma_window, compare_days)
+        
+        # 三种策略使用与单独回测相同的单日更新函数
+        single_pos = _score_step(single_pos, score, slope, threshold, slope_buy, slope_sell, score_missing)
+        price_pos = _price_step(price_pos, score, slope, threshold, trend_ok, score_missing)
+        volume_pos = _volume_step(volume_pos, score, volume_corrs[i], slope, threshold, score_missing)
+        
+        single_signals.append(single_pos)
+        price_signals.append(price_pos)
+        volume_signals.append(volume_pos)
+    
+    return single_signals, price_signals, volume_signals
+
+
+def backtest_standard_score_strategy_variants(df, threshold=None):
+    """
+    同时回测标准分、价格优化标准分、交易量优化标准分三种策略
+    
+    参数:
+        df: 数据框，必须包含 standard_score 和 volume_correlation 列
+        threshold: 分数阈值
+    
+    返回:
+        (single_signals, price_signals, volume_signals) 元组
+    """
+    threshold = threshold or CONFIG['STANDARD_SCORE_PARAMS']['threshold']
+    return _generate_standard_score_signal_variants(df, threshold)
+
+
+def _backtest_signals(strategy_func, df, **kwargs):
+    """
+    回测策略并只取信号
+    
+    参数:
+        strategy_func: backtest_* 策略函数
+        df: 数据框
+        kwargs: 传递给策略函数的参数
+    
+    返回:
+        signals 列表
+    """
+    # 斜率策略只返回信号，其余策略返回 (signals, df)
+    result = strategy_func(df, **kwargs)
+    return result[0] if isinstance(result, tuple) else result
+
+
+def get_signals(signals, key, strategy_func, df, **kwargs):
+    """
+    从共享信号字典中取策略信号，缺失时回测并写入字典
+    
+    信号字典由调用方为同一数据框创建并在各分析间传递，某策略首次用到时才回测；
+    不传字典时每次都基于当前数据框重新回测。传入策略参数时参数也计入字典键，
+    不同参数的信号互不覆盖
+    
+    参数:
+        signals: 共享信号字典 {策略键: signals}，可为 None
+        key: 策略键
+        strategy_func: backtest_* 策略函数
+        df: 数据框
+        kwargs: 传递给策略函数的参数
+    
+    返回:
+        signals 列表
+    """
+    if signals is None:
+        return _backtest_signals(strategy_func, df, **kwargs)
+    
+    signals_key = (key, tuple(sorted(kwargs.items()))) if kwargs else key
+    if signals_key not in signals:
+        signals[signals_key] = _backtest_signals(strategy_func, df, **kwargs)
+    return signals[signals_key]
@@ -1,9 +1,128 @@
 import pandas as pd
 import numpy as np
+from dataclasses import dataclass
 from config import CONFIG
 from logger_config import analysis_logger
 
 
+def as_float64(df, col):
+    """
+    取出数据框某列的 float64 连续数组
+    
+    float64 列直接返回底层数据视图而不复制；其他类型（如从 CSV 读入时被识别为
+    object 的列）只在此转换一次，保证后续 NumPy 运算走连续内存的快速路径
+    
+    参数:
+        df: 数据框
+        col: 列名
+    
+    返回:
+        float64 连续数组（可能与数据框共享内存，调用方不应原地修改）
+    """
+    return np.ascontiguousarray(df[col].to_numpy(dtype=np.float64))
+
+
+def _portfolio_value_kernel(close, signals, cost_rates, initial_capital):
+    """
+    按持仓区间批量计算多个成本率下的投资组合价值
+    
+    只在信号变化处（买入/卖出）更新持仓或现金，区间内净值直接由
+    持仓数量乘以收盘价得到，循环次数为交易次数而非天数。
+    
+    参数:
+        close: 收盘价数组 (float64)
+        signals: 交易信号数组 (int8)
+        cost_rates: 交易成本率序列
+        initial_capital: 初始资本
+    
+    返回:
+        形状为 (成本率个数, 天数) 的净值矩阵
+    """
+    cost_rates = np.asarray(cost_rates, dtype=np.float64)
+    values = np.empty((len(cost_rates), len(signals)))
+    if len(signals) == 0:
+        return values
+    
+    capital = np.full(len(cost_rates), float(initial_capital))
+    position = np.zeros(len(cost_rates))
+    
+    bounds = np.concatenate(([0], np.flatnonzero(np.diff(signals)) + 1, [len(signals)]))
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        price = close[start]
+        if signals[start] == 1:
+            # 买入信号（含首日即持仓）
+            position = capital / (price * (1 + cost_rates))
+            capital = np.zeros(len(cost_rates))
+            values[:, start:end] = position[:, None] * close[start:end]
+        else:
+            if start > 0:
+                # 卖出信号
+                capital = position * price * (1 - cost_rates)
+                position = np.zeros(len(cost_rates))
+            values[:, start:end] = capital[:, None]
+    
+    values[:, 0] = initial_capital
+    return values
+
+
+def _final_value_kernel(close, signals, cost_rate, initial_capital):
+    """
+    只计算最后一日的投资组合价值，不分配逐日净值数组
+    
+    与 _portfolio_value_kernel 采用相同的区间更新顺序，结果与其最后一列一致
+    
+    参数:
+        close: 收盘价数组 (float64)
+        signals: 交易信号数组 (int8)
+        cost_rate: 交易成本率
+        initial_capital: 初始资本
+    
+    返回:
+        最终净值 (float)
+    """
+    if len(signals) <= 1:
+        return float(initial_capital)
+    
+    capital = float(initial_capital)
+    position = 0.0
+    
+    # 只遍历信号变化点，循环次数为交易次数
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(signals)) + 1))
+    for start in starts:
+        price = close[start]
+        if signals[start] == 1:
+            position = capital / (price * (1 + cost_rate))
+            capital = 0.0
+        elif start > 0:
+            capital = position * price * (1 - cost_rate)
+            position = 0.0
+    
+    if signals[-1] == 1:
+        return float(position * close[-1])
+    return capital
+
+
+def _prepare_portfolio_inputs(df, signals):
+    """
+    校验输入并转换为计算净值所需的数组
+    
+    参数:
+        df: 数据框，必须包含'close'列
+        signals: 交易信号列表
+    
+    返回:
+        (close, signals) 数组元组
+    """
+    if 'close' not in df.columns:
+        raise ValueError("数据框必须包含 'close' 列")
+    
+    if len(signals) != len(df):
+        raise ValueError(f"信号数量 ({len(signals)}) 必须与数据框行数 ({len(df)}) 相同")
+    
+    close = as_float64(df, 'close')
+    return close, np.asarray(signals, dtype=np.int8)
+
+
 def calculate_portfolio_value(df, signals, cost_rate=0.0, initial_capital=1.0):
     """
     计算投资组合价值
@@ -15,47 +134,59 @@ def calculate_portfolio_value(df, signals, cost_rate=0.0, initial_capital=1.0):
         initial_capital: 初始资本 (默认1.0)
     
     返回:
-        包含每日投资组合价值的列表
+        包含每日投资组合价值的数组
     """
-    if 'close' not in df.columns:
-        raise ValueError("数据框必须包含 'close' 列")
+    close, signals = _prepare_portfolio_inputs(df, signals)
+    return _portfolio_value_kernel(close, signals, [cost_rate], initial_capital)[0]
+
+
+def calculate_portfolio_final_value(df, signals, cost_rate=0.0, initial_capital=1.0):
+    """
+    计算投资组合的最终净值（仅需最后一日结果时使用）
     
-    if len(signals) != len(df):
-        raise ValueError(f"信号数量 ({len(signals)}) 必须与数据框行数 ({len(df)}) 相同")
+    参数:
+        df: 数据框，必须包含'close'列
+        signals: 交易信号列表 (0=不持仓, 1=持仓)
+        cost_rate: 交易成本率 (默认0.0)
+        initial_capital: 初始资本 (默认1.0)
     
-    capital = initial_capital
-    position = 0
-    values = []
+    返回:
+        最终净值 (float)
+    """
+    close, signals = _prepare_portfolio_inputs(df, signals)
+    return _final_value_kernel(close, signals, cost_rate, initial_capital)
+
+
+def calculate_portfolio_values_by_cost(df, signals, cost_rates, initial_capital=1.0):
+    """
+    一次性计算多个交易成本率下的投资组合价值
     
-    for i in range(len(df)):
-        current_price = df['close'].iloc[i]
-        
-        if i == 0:
-            if signals[i] == 1:
-                position = capital / (current_price * (1 + cost_rate))
-                capital = 0
-            values.append(initial_capital)
-            continue
-        
-        prev_signal = signals[i-1]
-        current_signal = signals[i]
-        
-        if prev_signal == 0 and current_signal == 1:
-            # 买入信号
-            position = capital / (current_price * (1 + cost_rate))
-            capital = 0
-            
-        elif prev_signal == 1 and current_signal == 0:
-            # 卖出信号
-            capital = position * current_price * (1 - cost_rate)
-            position = 0
-        
-        if position > 0:
-            values.append(position * current_price)
-        else:
-            values.append(capital)
+    参数:
+        df: 数据框，必须包含'close'列
+        signals: 交易信号列表 (0=不持仓, 1=持仓)
+        cost_rates: 交易成本率列表
+        initial_capital: 初始资本 (默认1.0)
     
-    return values
+    返回:
+        形状为 (成本率个数, 天数) 的净值矩阵，每行对应一个成本率
+    """
+    close, signals = _prepare_portfolio_inputs(df, signals)
+    return _portfolio_value_kernel(close, signals, cost_rates, initial_capital)
+
+
+def get_dates(df):
+    """
+    获取日期列，若尚未转换为datetime类型则转换一次并写回数据框
+    
+    参数:
+        df: 数据框，必须包含'date'列
+    
+    返回:
+        datetime类型的日期序列
+    """
+    if not pd.api.types.is_datetime64_any_dtype(df['date']):
+        df['date'] = pd.to_datetime(df['date'], format=CONFIG['DATE_FORMAT'])
+    return df['date']
 
 
 def buy_hold_strategy(df):
@@ -89,4 +220,32 @@ def buy_hold_strategy(df):
             signals.append(1)
     
     return signals
-    
\ No newline at end of file
+
+
+@dataclass
+class PlotContext:
+    """
+    同一数据框上各图表共用的数据，每次分析流程只计算一次
+    
+    属性:
+        dates: datetime类型的日期序列
+        bh_values: 买入持有策略净值数组
+    """
+    dates: pd.Series
+    bh_values: np.ndarray
+
+
+def build_plot_context(df):
+    """
+    构建绘图共用数据
+    
+    参数:
+        df: 数据框，必须包含'date'和'close'列
+    
+    返回:
+        PlotContext 对象
+    """
+    return PlotContext(
+        dates=get_dates(df),
+        bh_values=calculate_portfolio_value(df, buy_hold_strategy(df)),
+    )